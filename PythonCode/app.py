@@ -6,6 +6,7 @@ from datetime import datetime
 from textblob import TextBlob
 import requests
 import pandas as pd
+import numpy as np
 from io import StringIO
 
 
@@ -21,6 +22,138 @@ model = genai.GenerativeModel('gemini-1.5-flash')
 
 CHAT_DATA_FILE = 'data/chats.json'
 
+SENTIMENTS = ['Positive', 'Negative', 'Neutral']
+POLARITY_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+class ChatHistoryColumns:
+    """Columnar (NumPy) view of chat_history, built once and appended to incrementally.
+
+    Keeps one array per field so summaries can filter and aggregate without
+    looping over every message in Python.
+    """
+
+    def __init__(self, chat_history=()):
+        n = len(chat_history)
+        capacity = max(16, n * 2)
+        self.size = 0
+        self.timestamps = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[us]')
+        self.sentiment_codes = np.full(capacity, -1, dtype=np.int8)   # index into SENTIMENTS, -1 = missing
+        self.polarity = np.full(capacity, np.nan)
+        self.subjectivity = np.full(capacity, np.nan)
+        self.sorted = True  # timestamps arrive in order, so date filters can use binary search
+
+        for chat in chat_history:
+            self.append(chat)
+
+    def _grow(self):
+        capacity = len(self.polarity) * 2
+        for name in ('timestamps', 'sentiment_codes', 'polarity', 'subjectivity'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, chat):
+        """Add one chat entry (same dict shape as chat_history items)"""
+        if self.size == len(self.polarity):
+            self._grow()
+        i = self.size
+
+        try:
+            ts = np.datetime64(chat.get('timestamp'), 'us')
+        except (ValueError, TypeError):
+            ts = np.datetime64('NaT')
+        self.timestamps[i] = ts
+        if np.isnat(ts) or (i > 0 and ts < self.timestamps[i - 1]):
+            self.sorted = False
+
+        analysis = chat.get('sentiment_analysis')
+        if analysis:
+            sentiment = analysis.get('sentiment')
+            self.sentiment_codes[i] = SENTIMENTS.index(sentiment) if sentiment in SENTIMENTS else -1
+            self.polarity[i] = analysis.get('polarity', np.nan)
+            self.subjectivity[i] = analysis.get('subjectivity', np.nan)
+        else:
+            self.sentiment_codes[i] = -1
+            self.polarity[i] = np.nan
+            self.subjectivity[i] = np.nan
+        self.size += 1
+
+    def select(self, start_date=None, end_date=None):
+        """Row indices of chats between start_date and end_date (inclusive dates)"""
+        if start_date is None and end_date is None:
+            return np.arange(self.size)
+
+        timestamps = self.timestamps[:self.size]
+        lo = np.datetime64(start_date, 'D').astype('datetime64[us]') if start_date else None
+        hi = (np.datetime64(end_date, 'D') + 1).astype('datetime64[us]') if end_date else None
+
+        if self.sorted:
+            first = np.searchsorted(timestamps, lo, side='left') if lo is not None else 0
+            last = np.searchsorted(timestamps, hi, side='left') if hi is not None else self.size
+            return np.arange(first, last)
+
+        mask = ~np.isnat(timestamps)
+        if lo is not None:
+            mask &= timestamps >= lo
+        if hi is not None:
+            mask &= timestamps < hi
+        return np.flatnonzero(mask)
+
+    def date_bounds(self):
+        valid = self.timestamps[:self.size]
+        valid = valid[~np.isnat(valid)]
+        if not len(valid):
+            return None, None
+        return valid.min().astype(datetime).date(), valid.max().astype(datetime).date()
+
+    def summarize(self, rows):
+        """Sentiment counts, polarity stats and per-day trend for the given rows"""
+        codes = self.sentiment_codes[rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(SENTIMENTS))
+
+        polarity = self.polarity[rows]
+        polarity = polarity[~np.isnan(polarity)]
+        polarity_stats = None
+        if len(polarity):
+            polarity_stats = {
+                'mean': float(polarity.mean()),
+                'percentiles': dict(zip(POLARITY_PERCENTILES, np.percentile(polarity, POLARITY_PERCENTILES))),
+            }
+
+        # Per-day trend: group rows by calendar day with np.unique + bincount
+        timestamps = self.timestamps[rows]
+        dated = ~np.isnat(timestamps)
+        days, day_index = np.unique(timestamps[dated].astype('datetime64[D]'), return_inverse=True)
+        day_codes = codes[dated]
+        day_polarity = self.polarity[rows][dated]
+        has_polarity = ~np.isnan(day_polarity)
+        daily_counts = np.zeros((len(days), len(SENTIMENTS)), dtype=int)
+        labelled = day_codes >= 0
+        np.add.at(daily_counts, (day_index[labelled], day_codes[labelled]), 1)
+        polarity_sum = np.bincount(day_index[has_polarity], weights=day_polarity[has_polarity], minlength=len(days))
+        polarity_n = np.bincount(day_index[has_polarity], minlength=len(days))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily_polarity = polarity_sum / polarity_n
+
+        daily = [
+            {
+                'date': str(day),
+                'messages': int(n_msgs),
+                'counts': dict(zip(SENTIMENTS, daily_counts[d].tolist())),
+                'avg_polarity': None if np.isnan(daily_polarity[d]) else float(daily_polarity[d]),
+            }
+            for d, (day, n_msgs) in enumerate(zip(days, np.bincount(day_index, minlength=len(days))))
+        ]
+
+        return {
+            'total': len(rows),
+            'counts': dict(zip(SENTIMENTS, counts.tolist())),
+            'polarity': polarity_stats,
+            'daily': daily,
+        }
+
 class MentalHealthChatbot:
     def __init__(self):
         self.ensure_data_directory()
@@ -199,40 +332,61 @@ class MentalHealthChatbot:
             st.error(f"Error generating response: {e}")
             return "I'm here to listen and support you. Could you tell me more about how you're feeling?", self.analyze_sentiment(user_input)
     
-    def export_chat_summary(self, chat_history):
-        """Export chat summary for sharing with psychologist"""
+    def export_chat_summary(self, chat_history, columns=None, start_date=None, end_date=None):
+        """Export chat summary for sharing with psychologist
+
+        columns: ChatHistoryColumns kept in sync with chat_history (built here if not given)
+        start_date / end_date: optional date range filter (inclusive)
+        """
         if not chat_history:
             return "No chat history available."
         
-        # Analyze overall sentiment patterns
-        sentiments = []
-        for chat in chat_history:
-            if 'sentiment_analysis' in chat:
-                sentiments.append(chat['sentiment_analysis']['sentiment'])
+        if columns is None:
+            columns = ChatHistoryColumns(chat_history)
+        rows = columns.select(start_date, end_date)
+        stats = columns.summarize(rows)
+        sentiment_summary = stats['counts']
         
-        sentiment_summary = {
-            'Positive': sentiments.count('Positive'),
-            'Negative': sentiments.count('Negative'),
-            'Neutral': sentiments.count('Neutral')
-        }
+        if start_date or end_date:
+            date_range = f"{start_date or 'start'} to {end_date or 'latest'}"
+        else:
+            date_range = "All conversations"
         
         # Create summary
         summary = f"""
 MENTAL HEALTH CHAT SESSION SUMMARY
 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Date range: {date_range}
 
 SENTIMENT ANALYSIS OVERVIEW:
 - Positive messages: {sentiment_summary['Positive']}
 - Negative messages: {sentiment_summary['Negative']}
 - Neutral messages: {sentiment_summary['Neutral']}
-- Total messages: {len(chat_history)}
-
-KEY THEMES AND CONCERNS:
+- Total messages: {stats['total']}
 """
         
+        polarity = stats['polarity']
+        if polarity:
+            percentiles = ", ".join(f"p{p}: {v:.2f}" for p, v in polarity['percentiles'].items())
+            summary += "\nPOLARITY DISTRIBUTION (-1 negative to +1 positive):\n"
+            summary += f"- Average polarity: {polarity['mean']:.2f}\n"
+            summary += f"- Percentiles: {percentiles}\n"
+        
+        if stats['daily']:
+            summary += "\nDAILY SENTIMENT TREND:\n"
+            for day in stats['daily']:
+                avg = f"{day['avg_polarity']:+.2f}" if day['avg_polarity'] is not None else "n/a"
+                counts = day['counts']
+                summary += (f"- {day['date']}: {day['messages']} messages "
+                            f"(Positive {counts['Positive']}, Negative {counts['Negative']}, Neutral {counts['Neutral']}), "
+                            f"avg polarity {avg}\n")
+        
+        summary += "\nKEY THEMES AND CONCERNS:\n"
+        
         # Add recent conversations
         summary += "\nRECENT CONVERSATIONS:\n"
-        for i, chat in enumerate(chat_history[-10:], 1):  # Last 10 conversations
+        for i, row in enumerate(rows[-10:], 1):  # Last 10 conversations in range
+            chat = chat_history[row]
             timestamp = chat.get('timestamp', 'Unknown time')
             user_msg = chat.get('user_message', '')
             bot_response = chat.get('bot_response', '')
@@ -264,6 +418,10 @@ def main():
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = st.session_state.chatbot.load_chat_history()
     
+    # Columnar copy of the history for summaries, kept in sync as messages are added
+    if 'chat_columns' not in st.session_state:
+        st.session_state.chat_columns = ChatHistoryColumns(st.session_state.chat_history)
+    
     # Sidebar for navigation
     with st.sidebar:
         st.title("🧠 Mental Health Support")
@@ -321,6 +479,7 @@ def main():
                     'sentiment_analysis': sentiment_analysis
                 }
                 st.session_state.chat_history.append(chat_entry)
+                st.session_state.chat_columns.append(chat_entry)
                 st.session_state.chatbot.save_chat_history(st.session_state.chat_history)
                 
                 # Add assistant message to session
@@ -405,11 +564,37 @@ def main():
         if st.session_state.chat_history:
             st.markdown("### Export options for sharing with healthcare professionals")
             
+            first_day, last_day = st.session_state.chat_columns.date_bounds()
+            start_date, end_date = None, None
+            if first_day:
+                selected = st.date_input(
+                    "Date range",
+                    value=(first_day, last_day),
+                    min_value=first_day,
+                    max_value=last_day
+                )
+                if not isinstance(selected, (tuple, list)):
+                    selected = (selected,)
+                if len(selected) == 2:
+                    start_date, end_date = selected
+                elif len(selected) == 1:
+                    # only one end picked so far: summarize that single day
+                    start_date = end_date = selected[0]
+                    st.caption(f"Only one date selected, summarizing {start_date}")
+                else:
+                    st.warning("No dates selected, summarizing the full history")
+                    start_date, end_date = first_day, last_day
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 if st.button("Generate Summary"):
-                    summary = st.session_state.chatbot.export_chat_summary(st.session_state.chat_history)
+                    summary = st.session_state.chatbot.export_chat_summary(
+                        st.session_state.chat_history,
+                        columns=st.session_state.chat_columns,
+                        start_date=start_date,
+                        end_date=end_date
+                    )
                     st.session_state.generated_summary = summary
             
             with col2:
@@ -0,0 +1,327 @@
+"""
+Offline microbenchmarks for the AI service hot paths.
+
+Covers:
+  • classify_texts            → throughput by batch size and text length
+                                 (truncating and sliding-window modes)
+  • analyze_sentiment         → throughput by text length
+  • load_or_create_vectorstore → sync + search time by roster size
+  • save_chat_history         → append cost by history length
+
+Runs without network access. By default a tiny randomly initialised BERT is
+written to a temp folder and used for both classification and embeddings, so
+numbers measure our code paths rather than the size of the real model. Pass
+--model-dir to benchmark a locally cached model instead.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --only classify sentiment --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+WORDS = (
+    "i feel very stressed about my exams and my career but my friends help "
+    "me when i am sad or anxious about work family relationship sleep study "
+    "happy tired worried hope better today tomorrow week job interview"
+).split()
+
+BATCH_SIZES = [1, 8, 32]
+TEXT_LENGTHS = [16, 64, 256]          # words per message
+LONG_TEXT_LENGTHS = [256, 1024]       # words per message for sliding-window mode
+ROSTER_SIZES = [10, 100, 500]
+HISTORY_LENGTHS = [10, 100, 1000]
+
+
+def make_text(n_words, rng):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def measure(fn, repeats=5, warmup=1):
+    """Run fn warmup+repeats times and return timing stats in seconds."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "repeats": repeats,
+        "mean_s": statistics.mean(times),
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def build_random_model(target_dir, seed=0):
+    """Save a tiny randomly initialised BERT classifier + tokenizer to target_dir."""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    torch.manual_seed(seed)  # same seed → same weights, so runs stay comparable with --baseline
+
+    os.makedirs(target_dir, exist_ok=True)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS))
+    vocab += list("abcdefghijklmnopqrstuvwxyz") + ["##" + c for c in "abcdefghijklmnopqrstuvwxyz"]
+    vocab = list(dict.fromkeys(vocab))  # "i" is both a word and a letter
+    vocab_file = os.path.join(target_dir, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab))
+
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        max_position_embeddings=512,
+        num_labels=4,
+    )
+    BertForSequenceClassification(config).save_pretrained(target_dir)
+    # positional: the keyword was renamed between transformers 4.x and 5.x
+    tokenizer = BertTokenizerFast(vocab_file)
+    tokenizer.save_pretrained(target_dir)
+    assert len(tokenizer) == len(vocab), f"tokenizer has {len(tokenizer)} tokens, expected {len(vocab)}"
+    return target_dir
+
+
+def setup_environment(model_dir, work_dir):
+    """Point flaskApi at local models and dummy keys before it is imported."""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    for key in ("GEMINI_API_KEY1", "GEMINI_API_KEY2", "GEMINI_API_KEY3",
+                "GROQ_API_KEY", "COHERE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    os.environ["CLASSIFIER_MODEL"] = model_dir
+    os.environ["EMBEDDING_MODEL"] = model_dir
+    os.environ["VECTORDIR"] = os.path.join(work_dir, "vectordb")
+
+
+# ---------------- Benchmarks ----------------
+
+def bench_classify(args, rng):
+    import flaskApi
+
+    results = []
+    for length in TEXT_LENGTHS:
+        for batch_size in BATCH_SIZES:
+            texts = [make_text(length, rng) for _ in range(batch_size)]
+            stats = measure(lambda: flaskApi.classify_texts(texts), args.repeats)
+            stats["throughput_per_s"] = batch_size / stats["median_s"]
+            results.append({
+                "benchmark": "classify_texts",
+                "params": {"batch_size": batch_size, "text_words": length},
+                **stats,
+            })
+
+    for length in LONG_TEXT_LENGTHS:
+        for batch_size in BATCH_SIZES:
+            texts = [make_text(length, rng) for _ in range(batch_size)]
+            stats = measure(lambda: flaskApi.classify_texts(texts, long_text=True), args.repeats)
+            stats["throughput_per_s"] = batch_size / stats["median_s"]
+            results.append({
+                "benchmark": "classify_texts_long",
+                "params": {"batch_size": batch_size, "text_words": length},
+                **stats,
+            })
+    return results
+
+
+def bench_sentiment(args, rng):
+    import flaskApi
+
+    results = []
+    n_texts = 100
+    for length in TEXT_LENGTHS:
+        texts = [make_text(length, rng) for _ in range(n_texts)]
+
+        def run():
+            for t in texts:
+                flaskApi.analyze_sentiment(t)
+
+        stats = measure(run, args.repeats)
+        stats["throughput_per_s"] = n_texts / stats["median_s"]
+        results.append({
+            "benchmark": "analyze_sentiment",
+            "params": {"n_texts": n_texts, "text_words": length},
+            **stats,
+        })
+    return results
+
+
+def make_roster(size, rng):
+    specs = ["anxiety", "depression", "career counselling", "relationships", "academic stress"]
+    return [
+        {
+            "User ID": i,
+            "Name": f"Dr {make_text(2, rng).title()}",
+            "Specialization": rng.choice(specs),
+            "Experience": rng.randint(1, 30),
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def bench_vectorstore(args, rng, work_dir):
+    import flaskApi
+
+    results = []
+    for size in ROSTER_SIZES:
+        roster = make_roster(size, rng)
+        sync_cold, sync_warm, search = [], [], []
+        for _ in range(args.repeats):
+            # fresh store for every repeat so the cold sync always inserts the full roster;
+            # a new path rather than deleting the old one, since chromadb caches clients per path
+            flaskApi.VECTORDIR = tempfile.mkdtemp(prefix="vectordb_", dir=work_dir)
+
+            start = time.perf_counter()
+            vectordb = flaskApi.load_or_create_vectorstore(roster)
+            sync_cold.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            vectordb = flaskApi.load_or_create_vectorstore(roster)
+            sync_warm.append(time.perf_counter() - start)
+
+            retriever = vectordb.as_retriever(search_kwargs={"k": 3})
+            start = time.perf_counter()
+            retriever.invoke("counsellor for exam anxiety")
+            search.append(time.perf_counter() - start)
+
+        for name, times in (("sync_cold", sync_cold), ("sync_warm", sync_warm), ("search", search)):
+            results.append({
+                "benchmark": f"vectorstore_{name}",
+                "params": {"roster_size": size},
+                "repeats": len(times),
+                "mean_s": statistics.mean(times),
+                "median_s": statistics.median(times),
+                "min_s": min(times),
+                "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+            })
+    return results
+
+
+def bench_chat_history(args, rng, work_dir):
+    import app
+
+    app.CHAT_DATA_FILE = os.path.join(work_dir, "chats.json")
+    # skip __init__: it creates ./data in the caller's working directory
+    chatbot = app.MentalHealthChatbot.__new__(app.MentalHealthChatbot)
+
+    results = []
+    for length in HISTORY_LENGTHS:
+        history = [
+            {
+                "timestamp": datetime.now().isoformat(),
+                "user_message": make_text(20, rng),
+                "bot_response": make_text(60, rng),
+                "sentiment_analysis": {"sentiment": "Neutral", "polarity": 0.0, "subjectivity": 0.0},
+            }
+            for _ in range(length)
+        ]
+        entry = history[-1]
+
+        def run():
+            # mirrors the chat page: append one entry then persist the whole list
+            history.append(entry)
+            chatbot.save_chat_history(history)
+            history.pop()
+
+        stats = measure(run, args.repeats)
+        results.append({
+            "benchmark": "save_chat_history",
+            "params": {"history_length": length},
+            **stats,
+        })
+    return results
+
+
+# ---------------- Reporting ----------------
+
+def result_key(result):
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare_to_baseline(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)["results"]}
+
+    print(f"\nComparison against {baseline_path} (median, negative = faster):")
+    for r in results:
+        old = baseline.get(result_key(r))
+        if not old:
+            continue
+        change = (r["median_s"] - old["median_s"]) / old["median_s"] * 100
+        print(f"  {r['benchmark']:<24} {json.dumps(r['params']):<40} "
+              f"{old['median_s'] * 1000:9.2f}ms → {r['median_s'] * 1000:9.2f}ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks for the AI service")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--model-dir", help="Locally cached model folder (default: tiny random BERT)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+",
+                        choices=["classify", "sentiment", "vectorstore", "chat_history"],
+                        help="Run a subset of benchmarks")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix="neurocare_bench_")
+    try:
+        model_dir = args.model_dir or build_random_model(os.path.join(work_dir, "model"), args.seed)
+        setup_environment(model_dir, work_dir)
+
+        import torch
+        torch.manual_seed(args.seed)
+
+        selected = args.only or ["classify", "sentiment", "vectorstore", "chat_history"]
+        results = []
+        if "classify" in selected:
+            results += bench_classify(args, rng)
+        if "sentiment" in selected:
+            results += bench_sentiment(args, rng)
+        if "vectorstore" in selected:
+            results += bench_vectorstore(args, rng, work_dir)
+        if "chat_history" in selected:
+            results += bench_chat_history(args, rng, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "torch": torch.__version__,
+            "device": "cuda" if torch.cuda.is_available() else "cpu",
+            "model": args.model_dir or "random-tiny-bert",
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        extra = f"  {r['throughput_per_s']:.1f}/s" if "throughput_per_s" in r else ""
+        print(f"{r['benchmark']:<24} {json.dumps(r['params']):<40} {r['median_s'] * 1000:9.2f}ms{extra}")
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
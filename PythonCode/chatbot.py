@@ -1,35 +1,63 @@
-from langchain_ollama import OllamaLLM
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+import time
 
-# Create LLM connection
-llm = OllamaLLM(model="phi3")
+import ollama
+
+MODEL = "phi3"
+KEEP_ALIVE = "30m"  # keep phi3 loaded between turns instead of reloading it
 
 # Define system prompt (your persona)
-prompt_text = """You are an expert mental health doctor.
-Respond with empathy and professionalism in 3–4 sentences maximum..
-
-Conversation:
-{history}
-User: {input}
-AI:"""
-
-prompt = PromptTemplate(
-    input_variables=["history", "input"],
-    template=prompt_text,
-)
-
-# Memory setup
-memory = ConversationBufferMemory(memory_key="history")
-
-# Create the chain
-chain = LLMChain(
-    llm=llm,
-    prompt=prompt,
-    memory=memory,
-    verbose=False
-)
+system_prompt = """You are an expert mental health doctor.
+Respond with empathy and professionalism in 3–4 sentences maximum."""
+
+# Ollama returns the evaluated conversation as a token context; passing it back
+# on the next turn means only the new user message has to be evaluated,
+# instead of re-sending the whole history like ConversationBufferMemory did.
+context = None
+
+
+def seconds(ns):
+    return (ns or 0) / 1e9
+
+
+def chat_turn(user_input, context):
+    """Stream one reply to stdout; returns (new_context, final_chunk).
+
+    If the stream stops early (Ctrl-C, dropped connection) there is no final
+    chunk, so the previous context is kept and final_chunk is None.
+    """
+    stream = ollama.generate(
+        model=MODEL,
+        prompt=user_input,
+        system=system_prompt if context is None else None,
+        context=context,
+        keep_alive=KEEP_ALIVE,
+        stream=True,
+    )
+
+    print("AI: ", end="", flush=True)
+    final = None
+    try:
+        for chunk in stream:
+            print(chunk.get("response", ""), end="", flush=True)
+            if chunk.get("done"):
+                final = chunk
+    except KeyboardInterrupt:
+        print(" [interrupted]", end="")
+    print()
+    if final is None:
+        return context, None
+    return final.get("context"), final
+
+
+def print_timings(final, wall):
+    prompt_tokens = final.get("prompt_eval_count") or 0
+    gen_tokens = final.get("eval_count") or 0
+    gen_time = seconds(final.get("eval_duration"))
+    rate = gen_tokens / gen_time if gen_time else 0
+    print(f"   [prompt eval: {prompt_tokens} tok in {seconds(final.get('prompt_eval_duration')):.2f}s | "
+          f"generation: {gen_tokens} tok in {gen_time:.2f}s ({rate:.1f} tok/s) | "
+          f"load: {seconds(final.get('load_duration')):.2f}s | wall: {wall:.2f}s]\n")
+
 
 print("🧠 Local Mental Health Chatbot (type 'exit' to quit)\n")
 
@@ -39,5 +67,7 @@ while True:
         print("Goodbye 👋")
         break
 
-    result = chain.run(input=user_input)
-    print("AI:", result, "\n")
+    start = time.perf_counter()
+    context, final = chat_turn(user_input, context)
+    if final is not None:
+        print_timings(final, time.perf_counter() - start)
@@ -11,10 +11,10 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from datasets import ClassLabel
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
 # NEW LANGCHAIN 2025 IMPORTS
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 
 
 
@@ -31,6 +31,10 @@ from langchain_community.vectorstores import Chroma
 
 from langchain_groq import ChatGroq
 
+import metrics
+import profiling
+from metrics import stage, upstream
+
 
 
 user_memories = {}
@@ -50,15 +54,27 @@ print(f"Using GEMINI_API_KEY{api_key_number}")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 
+# Optional base URLs so load tests can point at stub_providers.py instead of the real APIs
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE")
+COHERE_BASE_URL = os.getenv("COHERE_BASE_URL")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+
 # Configure APIs
-genai.configure(api_key=GEMINI_API_KEY)
+if GEMINI_API_BASE:
+    genai.configure(api_key=GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_BASE})
+else:
+    genai.configure(api_key=GEMINI_API_KEY)
 gemini_model = genai.GenerativeModel('gemini-2.5-flash')
 
-co = cohere.ClientV2(COHERE_API_KEY)  # Initialize Cohere client
+if COHERE_BASE_URL:
+    co = cohere.ClientV2(COHERE_API_KEY, base_url=COHERE_BASE_URL)
+else:
+    co = cohere.ClientV2(COHERE_API_KEY)  # Initialize Cohere client
 os.environ['GROQ_API_KEY'] = GROQ_API_KEY
 
 # Load fine-tuned model and tokenizer from local folder
-MODEL_REPO = "kps05/ClassifyMessages_NeuroCare"
+# CLASSIFIER_MODEL can point at a local folder (e.g. for offline benchmarks)
+MODEL_REPO = os.getenv("CLASSIFIER_MODEL", "kps05/ClassifyMessages_NeuroCare")
 model = AutoModelForSequenceClassification.from_pretrained(MODEL_REPO)
 tokenizer = AutoTokenizer.from_pretrained(MODEL_REPO)
 
@@ -70,6 +86,29 @@ model.to(device)
 labels = ["academic", "career", "relationship", "other"]
 label_map = ClassLabel(names=labels).int2str
 
+# Long-text mode: split messages longer than CLASSIFY_MAX_LENGTH tokens into overlapping
+# windows, classify every window and pool the logits back per message
+CLASSIFY_MAX_LENGTH = 256
+CLASSIFY_LONG_TEXT = os.getenv("CLASSIFY_LONG_TEXT", "false").lower() == "true"
+CLASSIFY_WINDOW_OVERLAP = int(os.getenv("CLASSIFY_WINDOW_OVERLAP", "64"))     # tokens shared by neighbouring windows
+CLASSIFY_MAX_WINDOWS = int(os.getenv("CLASSIFY_MAX_WINDOWS", "8"))            # cap per message, keeps worst case bounded
+CLASSIFY_WINDOW_BATCH = int(os.getenv("CLASSIFY_WINDOW_BATCH", "64"))         # windows per forward pass
+CLASSIFY_POOLING = os.getenv("CLASSIFY_POOLING", "mean")
+POOLING_RULES = {
+    "mean": lambda logits: logits.mean(dim=0),
+    "max": lambda logits: logits.max(dim=0).values,
+    "first": lambda logits: logits[0],
+}
+if CLASSIFY_POOLING not in POOLING_RULES:
+    raise ValueError(f"CLASSIFY_POOLING must be one of {list(POOLING_RULES)}")
+max_overlap = CLASSIFY_MAX_LENGTH - tokenizer.num_special_tokens_to_add()
+if not 0 <= CLASSIFY_WINDOW_OVERLAP < max_overlap:
+    raise ValueError(f"CLASSIFY_WINDOW_OVERLAP must be between 0 and {max_overlap - 1}")
+if CLASSIFY_MAX_WINDOWS < 1:
+    raise ValueError("CLASSIFY_MAX_WINDOWS must be at least 1")
+if CLASSIFY_WINDOW_BATCH < 1:
+    raise ValueError("CLASSIFY_WINDOW_BATCH must be at least 1")
+
 # Flask app
 app = Flask(__name__)
 CORS(app)
@@ -96,8 +135,12 @@ def analyze_sentiment(text):
 #             break
 #     return text
 
+# Returned with HTTP 200 when Gemini fails; loadgen.py matches on it to count those as errors
+FALLBACK_REPLY = "I'm sorry, I'm having trouble responding right now. Please try again."
+
 def generate_response(user_input, session_id):
-    sentiment_analysis = analyze_sentiment(user_input)
+    with stage("sentiment"):
+        sentiment_analysis = analyze_sentiment(user_input)
     
     # Get conversation memory for this session
    
@@ -126,44 +169,98 @@ def generate_response(user_input, session_id):
     """
     
     try:
-        response = gemini_model.generate_content(prompt)
-        ai_response = response.text
+        with upstream("gemini"):
+            response = gemini_model.generate_content(prompt)
+            ai_response = response.text
         
        
         
         return ai_response, sentiment_analysis
     except Exception as e:
         print(f"Error generating response: {str(e)}")
-        return "I'm sorry, I'm having trouble responding right now. Please try again.", sentiment_analysis
+        return FALLBACK_REPLY, sentiment_analysis
 
-def classify_texts(texts):
+def classify_texts(texts, long_text=None, pooling=None):
     """
     texts: list of strings
+    long_text: use sliding windows instead of truncating (default CLASSIFY_LONG_TEXT)
+    pooling: how window logits are combined in long-text mode (default CLASSIFY_POOLING)
     returns: list of predicted labels
     """
     if not texts:
         return []
 
-    inputs = tokenizer(
-        texts,
-        return_tensors="pt",
-        truncation=True,
-        padding=True,
-        max_length=256
-    )
-    inputs = {k: v.to(device) for k, v in inputs.items()}
+    if long_text is None:
+        long_text = CLASSIFY_LONG_TEXT
+    if long_text:
+        return classify_long_texts(texts, pooling or CLASSIFY_POOLING)
+
+    metrics.BATCH_SIZE.observe(len(texts))
 
-    with torch.no_grad():
+    with stage("tokenize"):
+        inputs = tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=CLASSIFY_MAX_LENGTH
+        )
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+
+    with stage("forward"), torch.no_grad():
         outputs = model(**inputs)
         predicted_ids = torch.argmax(outputs.logits, dim=-1).cpu().tolist()
 
     predicted_labels = [label_map(i) for i in predicted_ids]
     return predicted_labels
 
+def classify_long_texts(texts, pooling):
+    """
+    Sliding-window version of classify_texts. Windows from all messages are
+    batched together; each message keeps at most CLASSIFY_MAX_WINDOWS windows.
+    """
+    pool = POOLING_RULES[pooling]
+
+    with stage("tokenize"):
+        encoded = tokenizer(
+            texts,
+            truncation=True,
+            max_length=CLASSIFY_MAX_LENGTH,
+            stride=CLASSIFY_WINDOW_OVERLAP,
+            return_overflowing_tokens=True,
+        )
+        # windows come back grouped by message, in order
+        sample_map = encoded.pop("overflow_to_sample_mapping")
+        keep, counts = [], [0] * len(texts)
+        for window_idx, message_idx in enumerate(sample_map):
+            if counts[message_idx] < CLASSIFY_MAX_WINDOWS:
+                counts[message_idx] += 1
+                keep.append(window_idx)
+        windows = [{k: encoded[k][i] for k in encoded.keys()} for i in keep]
+
+    metrics.BATCH_SIZE.observe(len(texts))
+    metrics.CLASSIFY_WINDOWS.observe(len(windows))
+
+    all_logits = []
+    with stage("forward"), torch.no_grad():
+        for start in range(0, len(windows), CLASSIFY_WINDOW_BATCH):
+            batch = tokenizer.pad(windows[start:start + CLASSIFY_WINDOW_BATCH], return_tensors="pt")
+            batch = {k: v.to(device) for k, v in batch.items()}
+            all_logits.append(model(**batch).logits)
+        logits = torch.cat(all_logits)
+        predicted_ids = [
+            torch.argmax(pool(message_logits)).item()
+            for message_logits in torch.split(logits, counts)
+        ]
+
+    return [label_map(i) for i in predicted_ids]
+
 
 
 app = Flask(__name__)
 CORS(app)
+metrics.init_app(app)
+profiling.init_app(app)
 
 @app.route("/api/ai-response", methods=["POST"])
 def ai_response():
@@ -180,12 +277,32 @@ def ai_response():
         "sentiment": sentiment_analysis["sentiment"]
     })
 # --- Doctor Query API ---
-embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-embeddings_model = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-groq_llm = ChatGroq(model="llama-3.1-8b-instant")
-VECTORDIR = "./vectordb"
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+embed_model = SentenceTransformer(EMBEDDING_MODEL)
+
+class TimedEmbeddings(Embeddings):
+    """Wraps an embeddings model so embedding time shows up as its own stage."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def embed_documents(self, texts):
+        with stage("embedding"):
+            return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        with stage("embedding"):
+            return self.inner.embed_query(text)
+
+embeddings_model = TimedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL))
+groq_llm = ChatGroq(model="llama-3.1-8b-instant", base_url=GROQ_BASE_URL)
+VECTORDIR = os.getenv("VECTORDIR", "./vectordb")
 
 def load_or_create_vectorstore(doctors_list):
+    with stage("vectorstore_sync"):
+        return _sync_vectorstore(doctors_list)
+
+def _sync_vectorstore(doctors_list):
     try:
         vectordb = Chroma(persist_directory=VECTORDIR, embedding_function=embeddings_model)
         existing_docs = vectordb.get(include=["metadatas", "documents"])
@@ -198,12 +315,15 @@ def load_or_create_vectorstore(doctors_list):
                 continue
 
         new_docs = [Document(page_content=str(doc)) for doc in doctors_list if doc.get("User ID") not in existing_user_ids]
+        metrics.VECTORSTORE_DOCS.labels("hit").inc(len(doctors_list) - len(new_docs))
+        metrics.VECTORSTORE_DOCS.labels("added").inc(len(new_docs))
         if new_docs:
             vectordb.add_documents(new_docs)
             vectordb.persist()
 
     except Exception:
         documents = [Document(page_content=str(doc)) for doc in doctors_list]
+        metrics.VECTORSTORE_DOCS.labels("added").inc(len(documents))
         vectordb = Chroma.from_documents(documents=documents, embedding=embeddings_model, persist_directory=VECTORDIR)
         vectordb.persist()
 
@@ -229,12 +349,13 @@ def summarize_text():
         """
 
         # Call Cohere Chat API
-        response = co.chat(
-            model="command-a-03-2025",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.4,
-            max_tokens=800
-        )
+        with upstream("cohere"):
+            response = co.chat(
+                model="command-a-03-2025",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.4,
+                max_tokens=800
+            )
 
         # Extract generated text
         if isinstance(response.message.content, list):
@@ -292,19 +413,18 @@ def query_doctors():
     Answer:
     """)
 
-    # NEW Retrieval Chain (No RetrievalQA)
-    retrieval_chain = (
-        {"context": retriever, "question": RunnablePassthrough()}
-        | prompt
-        | groq_llm
-    )
+    # Retrieve once and reuse the docs for both the prompt context and the user_ids,
+    # so retrieval and the LLM call are timed as separate stages
+    with stage("retrieval"):
+        retrieved_docs = retriever.invoke(user_query)
 
-    answer_text = retrieval_chain.invoke(user_query)
+    answer_chain = prompt | groq_llm
+    with upstream("groq"):
+        answer_text = answer_chain.invoke({"context": retrieved_docs, "question": user_query})
     
     # Convert AIMessage to string content
     answer_text = answer_text.content if hasattr(answer_text, "content") else str(answer_text)
 
-    retrieved_docs = retriever.invoke(user_query)
     user_ids = []
     for doc in retrieved_docs:
         try:
@@ -320,13 +440,22 @@ def classify_messages():
     """
     Expects JSON payload:
     {"messages": ["message1", "message2", ...]}
+    Optional: "long_text": true/false, "pooling": "mean" | "max" | "first"
     """
     data = request.get_json()
     texts = data.get("messages", [])
     if not texts:
         return jsonify({"error": "No messages provided"}), 400
 
-    predictions = classify_texts(texts)
+    long_text = data.get("long_text")
+    if long_text is not None and not isinstance(long_text, bool):
+        return jsonify({"error": "long_text must be true or false"}), 400
+
+    pooling = data.get("pooling")
+    if pooling is not None and pooling not in POOLING_RULES:
+        return jsonify({"error": f"pooling must be one of {list(POOLING_RULES)}"}), 400
+
+    predictions = classify_texts(texts, long_text=long_text, pooling=pooling)
     return jsonify({"predictions": predictions})
 
 
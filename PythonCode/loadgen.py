@@ -0,0 +1,235 @@
+"""
+Open-loop load generator for flaskApi.py.
+
+Replays a weighted mix of /api/ai-response, /api/summarize, /query and
+/api/classify-messages requests at a target rate (Poisson arrivals) and
+reports throughput and p50/p95/p99 latency per endpoint.
+
+Latency is measured from each request's scheduled start time, so a backed-up
+server shows up as higher latency instead of a silently lower send rate.
+
+/api/ai-response catches Gemini failures and still answers 200 with
+flaskApi.FALLBACK_REPLY, so responses carrying that text are counted as
+errors here (they also show up in neurocare_upstream_errors_total).
+
+Run it against a Flask service wired to stub_providers.py:
+    python stub_providers.py &
+    GEMINI_API_BASE=http://127.0.0.1:8101 COHERE_BASE_URL=http://127.0.0.1:8102 \\
+        GROQ_BASE_URL=http://127.0.0.1:8103 python flaskApi.py &
+    python loadgen.py --rate 20 --duration 60 --output load.json
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Must match flaskApi.FALLBACK_REPLY (not imported, flaskApi loads models at import)
+AI_FALLBACK_REPLY = "I'm sorry, I'm having trouble responding right now. Please try again."
+
+STUDENT_MESSAGES = [
+    "I have three exams next week and I can't sleep",
+    "My internship interview went badly and I feel useless",
+    "I had a fight with my best friend and we are not talking",
+    "I feel lonely in the hostel and miss my family",
+    "I am happy today, I finally finished my project",
+    "I keep procrastinating and my grades are dropping",
+    "I don't know which career path to choose after graduation",
+    "My partner and I broke up and I can't focus on anything",
+    "I feel anxious before every presentation",
+    "Nothing specific, just feeling a bit low lately",
+]
+
+DOCTORS = [
+    {"User ID": i, "Name": name, "Specialization": spec, "Experience": exp}
+    for i, (name, spec, exp) in enumerate([
+        ("Dr Mehta", "exam stress and anxiety", 8),
+        ("Dr Kaur", "relationships and family", 12),
+        ("Dr Sharma", "career counselling", 5),
+        ("Dr Gill", "depression and loneliness", 15),
+        ("Dr Rao", "sleep and burnout", 7),
+        ("Dr Iyer", "academic performance", 10),
+    ], start=1)
+]
+
+DOCTOR_QUERIES = [
+    "Which counselor is best for a student with exam anxiety?",
+    "Who can help with a relationship breakup?",
+    "Suggest someone for career confusion",
+    "Student feels lonely and low, who should they see?",
+]
+
+
+def ai_response_payload(rng):
+    return {"message": rng.choice(STUDENT_MESSAGES), "session_id": f"load-{rng.randint(1, 50)}"}
+
+
+def summarize_payload(rng):
+    turns = []
+    for _ in range(rng.randint(4, 12)):
+        turns.append(f"Student: {rng.choice(STUDENT_MESSAGES)}")
+        turns.append("Counselor: Thank you for sharing that. Can you tell me more?")
+    return {"raw_text": "\n".join(turns)}
+
+
+def query_payload(rng):
+    return {"query": rng.choice(DOCTOR_QUERIES), "doctors": DOCTORS}
+
+
+def classify_payload(rng):
+    return {"messages": [rng.choice(STUDENT_MESSAGES) for _ in range(rng.randint(1, 20))]}
+
+
+ENDPOINTS = {
+    # name: (path, payload builder, default weight)
+    "ai-response": ("/api/ai-response", ai_response_payload, 50),
+    "summarize": ("/api/summarize", summarize_payload, 10),
+    "query": ("/query", query_payload, 10),
+    "classify": ("/api/classify-messages", classify_payload, 30),
+}
+
+
+def parse_mix(spec):
+    """'ai-response=5,classify=3' → {'ai-response': 5.0, 'classify': 3.0}"""
+    mix = {}
+    for part in spec.split(","):
+        name, weight = part.split("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+
+    def record(self, name, latency, ok):
+        with self.lock:
+            if ok:
+                self.latencies[name].append(latency)
+            else:
+                self.errors[name] += 1
+
+
+def send(session, base_url, name, payload, scheduled_at, timeout, recorder):
+    path = ENDPOINTS[name][0]
+    try:
+        response = session.post(base_url + path, json=payload, timeout=timeout)
+        ok = response.status_code == 200
+        if ok and name == "ai-response":
+            ok = response.json().get("aiResponse") != AI_FALLBACK_REPLY
+    except (requests.RequestException, ValueError):
+        ok = False
+    recorder.record(name, time.perf_counter() - scheduled_at, ok)
+
+
+def run_load(base_url, rate, duration, mix, max_workers, timeout, seed):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    recorder = Recorder()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    sent = 0
+    start = time.perf_counter()
+    next_at = start
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while next_at - start < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            payload = ENDPOINTS[name][1](rng)
+            pool.submit(send, session, base_url, name, payload, next_at, timeout, recorder)
+            sent += 1
+            next_at += rng.expovariate(rate)
+        # send rate is judged on the scheduling loop alone, not the drain below
+        send_elapsed = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+
+    return build_report(recorder, sent, send_elapsed, elapsed, rate)
+
+
+def build_report(recorder, sent, send_elapsed, elapsed, target_rate):
+    """elapsed includes waiting for in-flight requests; send_elapsed does not."""
+    endpoints = {}
+    for name in ENDPOINTS:
+        lat = sorted(recorder.latencies[name])
+        errors = recorder.errors[name]
+        total = len(lat) + errors
+        if not total:
+            continue
+        endpoints[name] = {
+            "requests": total,
+            "errors": errors,
+            "error_rate": errors / total,
+            "throughput_per_s": len(lat) / elapsed,
+            "p50_ms": percentile(lat, 50) * 1000 if lat else None,
+            "p95_ms": percentile(lat, 95) * 1000 if lat else None,
+            "p99_ms": percentile(lat, 99) * 1000 if lat else None,
+            "max_ms": lat[-1] * 1000 if lat else None,
+        }
+    return {
+        "target_rate_per_s": target_rate,
+        "achieved_send_rate_per_s": sent / send_elapsed,
+        "send_elapsed_s": send_elapsed,
+        "elapsed_s": elapsed,
+        "requests_sent": sent,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report):
+    print(f"\nSent {report['requests_sent']} requests in {report['send_elapsed_s']:.1f}s "
+          f"({report['achieved_send_rate_per_s']:.1f}/s, target {report['target_rate_per_s']}/s), "
+          f"all responses in {report['elapsed_s']:.1f}s\n")
+    print(f"{'endpoint':<12} {'reqs':>6} {'errors':>7} {'ok/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<12} {stats['requests']:>6} {stats['errors']:>7} {stats['throughput_per_s']:>7.1f} "
+              f"{fmt(stats['p50_ms'])} {fmt(stats['p95_ms'])} {fmt(stats['p99_ms'])}")
+
+
+def main():
+    default_mix = ",".join(f"{name}={weight}" for name, (_, _, weight) in ENDPOINTS.items())
+    parser = argparse.ArgumentParser(description="Load generator for the Flask AI service")
+    parser.add_argument("--url", default="http://127.0.0.1:5001", help="Base URL of flaskApi.py")
+    parser.add_argument("--rate", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--mix", default=default_mix, help=f"Endpoint weights (default: {default_mix})")
+    parser.add_argument("--max-workers", type=int, default=64, help="Max in-flight requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = run_load(args.url.rstrip("/"), args.rate, args.duration, parse_mix(args.mix),
+                      args.max_workers, args.timeout, args.seed)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
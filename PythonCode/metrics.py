@@ -0,0 +1,98 @@
+"""
+Prometheus metrics for flaskApi.py.
+
+Request latency is recorded per endpoint by request hooks; the stage()
+context manager records where the time inside a request went (tokenize,
+forward, embedding, vectorstore_sync, retrieval, llm, ...). Everything is
+exposed in Prometheus text format on /metrics.
+"""
+from contextlib import contextmanager
+import time
+
+from flask import g, has_request_context, request, Response
+from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# Buckets span fast CPU stages (~1ms) up to slow upstream LLM calls (~30s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "neurocare_request_seconds", "End-to-end request latency",
+    ["endpoint", "status"], buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "neurocare_stage_seconds", "Latency of a processing stage inside a request",
+    ["endpoint", "stage"], buckets=LATENCY_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "neurocare_classify_batch_size", "Number of messages per classify_texts call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+CLASSIFY_WINDOWS = Histogram(
+    "neurocare_classify_windows", "Token windows per classify_texts call in long-text mode",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+VECTORSTORE_DOCS = Counter(
+    "neurocare_vectorstore_docs_total", "Doctor profiles seen during vector store sync",
+    ["result"],  # "hit" = already stored, "added" = embedded and inserted
+)
+UPSTREAM_CALLS = Counter(
+    "neurocare_upstream_calls_total", "Calls to upstream LLM providers", ["provider"],
+)
+UPSTREAM_ERRORS = Counter(
+    "neurocare_upstream_errors_total", "Failed calls to upstream LLM providers", ["provider"],
+)
+
+
+def current_endpoint():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return "none"
+
+
+@contextmanager
+def stage(name):
+    """Time a block of work as a stage of the current endpoint."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(current_endpoint(), name).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def upstream(provider):
+    """Time an upstream LLM call and count it (and any failure) per provider."""
+    UPSTREAM_CALLS.labels(provider).inc()
+    try:
+        with stage(f"llm_{provider}"):
+            yield
+    except Exception:
+        UPSTREAM_ERRORS.labels(provider).inc()
+        raise
+
+
+def init_app(app):
+    """Register request timing hooks and the /metrics endpoint on a Flask app."""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    # Recorded on teardown, not after_request: with debug=True (PROPAGATE_EXCEPTIONS)
+    # Flask skips after_request for unhandled errors, which would hide failed requests
+    @app.teardown_request
+    def _record_request(exc):
+        start = g.pop("metrics_start", None)
+        status = 500 if exc is not None else g.pop("metrics_status", 500)
+        endpoint = current_endpoint()
+        if start is not None and endpoint != "/metrics":
+            REQUEST_LATENCY.labels(endpoint, str(status)).observe(time.perf_counter() - start)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        return Response(generate_latest(), content_type=CONTENT_TYPE_LATEST)
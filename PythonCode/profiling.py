@@ -0,0 +1,150 @@
+"""
+On-demand profiling hooks for flaskApi.py.
+
+Two ways to profile without redeploying:
+  • Per request  → cProfile a random PROFILE_SAMPLE_RATE fraction of requests,
+                   or any request sending the PROFILE_HEADER header with the
+                   PROFILE_TOKEN value. Writes <PROFILE_DIR>/<endpoint>/*.prof
+                   (open with `python -m pstats` or snakeviz).
+  • Whole process → POST /admin/profile?seconds=N with the same header samples
+                   every thread's stack for N seconds and writes a
+                   collapsed-stack file (feed to flamegraph.pl / speedscope).
+
+Configuration (environment):
+    PROFILE_SAMPLE_RATE  fraction of requests to profile (default 0 = off)
+    PROFILE_HEADER       header that forces profiling (default X-Profile)
+    PROFILE_TOKEN        value the header must carry; header/admin endpoint are
+                         disabled when unset
+    PROFILE_DIR          output folder (default ./profiles)
+"""
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, jsonify, request
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+MAX_PROCESS_PROFILE_SECONDS = 300
+SAMPLE_INTERVAL = 0.005  # 5ms between stack samples
+
+_process_profile_lock = threading.Lock()
+
+
+def _endpoint_slug():
+    rule = request.url_rule.rule if request.url_rule is not None else "unknown"
+    return rule.strip("/").replace("/", "_") or "root"
+
+
+def _output_path(folder, suffix):
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return os.path.join(folder, f"{stamp}_{threading.get_ident()}{suffix}")
+
+
+def _has_token():
+    return PROFILE_TOKEN is not None and request.headers.get(PROFILE_HEADER) == PROFILE_TOKEN
+
+
+def _should_profile_request():
+    if _has_token():
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+# ---------------- Whole-process sampling ----------------
+
+def _frame_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample_process(seconds, interval=SAMPLE_INTERVAL):
+    """Sample every thread's stack for `seconds`; returns Counter of collapsed stacks."""
+    samples = Counter()
+    me = threading.get_ident()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = [names.get(thread_id, str(thread_id))] + _frame_stack(frame)
+            samples[";".join(stack)] += 1
+        time.sleep(interval)
+    return samples
+
+
+def write_collapsed(samples, path):
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+# ---------------- Flask wiring ----------------
+
+def init_app(app):
+    """Register per-request profiling hooks and the /admin/profile endpoint."""
+
+    @app.before_request
+    def _start_profile():
+        if request.path == "/admin/profile" or not _should_profile_request():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # another profiler is already active on this interpreter
+        g.profiler = profiler
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+        profiler.disable()
+        try:
+            profiler.dump_stats(_output_path(os.path.join(PROFILE_DIR, _endpoint_slug()), ".prof"))
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+
+    @app.route("/admin/profile", methods=["POST"])
+    def profile_process():
+        if not _has_token():
+            return jsonify({"error": "Forbidden"}), 403
+
+        try:
+            seconds = float(request.args.get("seconds", 10))
+        except ValueError:
+            return jsonify({"error": "'seconds' must be a number"}), 400
+        if not 0 < seconds <= MAX_PROCESS_PROFILE_SECONDS:
+            return jsonify({"error": f"'seconds' must be between 0 and {MAX_PROCESS_PROFILE_SECONDS}"}), 400
+
+        if not _process_profile_lock.acquire(blocking=False):
+            return jsonify({"error": "A process profile is already running"}), 409
+        try:
+            samples = sample_process(seconds)
+        finally:
+            _process_profile_lock.release()
+
+        path = _output_path(os.path.join(PROFILE_DIR, "process"), ".collapsed")
+        write_collapsed(samples, path)
+        return jsonify({
+            "file": path,
+            "seconds": seconds,
+            "samples": sum(samples.values()),
+            "top_stacks": [{"stack": s, "count": c} for s, c in samples.most_common(10)],
+        })
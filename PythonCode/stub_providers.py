@@ -0,0 +1,210 @@
+"""
+Local stand-ins for the Gemini, Cohere and Groq APIs used by flaskApi.py.
+
+Each provider listens on its own port, sleeps for a latency drawn from a
+configurable distribution and fails a configurable fraction of requests, so
+the Flask service can be load-tested without spending real quota.
+
+Latency specs (milliseconds):
+    fixed:200            → always 200ms
+    uniform:100:400      → uniform between 100 and 400ms
+    normal:300:50        → mean 300, std 50 (clipped at 0)
+    lognormal:250:0.5    → median 250, sigma 0.5 (long tail, closest to real LLMs)
+
+Usage:
+    python stub_providers.py --gemini-latency lognormal:800:0.4 --groq-error-rate 0.02
+
+Then start the Flask service against the stubs:
+    GEMINI_API_BASE=http://127.0.0.1:8101 \\
+    COHERE_BASE_URL=http://127.0.0.1:8102 \\
+    GROQ_BASE_URL=http://127.0.0.1:8103 \\
+    python flaskApi.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_REPLY = (
+    "It sounds like you have a lot on your mind right now. That is completely understandable. "
+    "Try taking a few slow breaths and focusing on one small step you can take today. "
+    "Would you like to talk more about what is weighing on you the most?"
+)
+STUB_SUMMARY = json.dumps({
+    "title": "Stub conversation summary",
+    "content": "The student discussed exam stress and the counselor suggested breathing exercises.",
+})
+
+
+def parse_latency(spec):
+    """Turn a latency spec string into a function returning seconds."""
+    kind, *params = spec.split(":")
+    params = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: params[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(params[0], params[1]) / 1000
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(params[0], params[1])) / 1000
+    if kind == "lognormal":
+        # params[0] is the median, so mu = ln(median)
+        mu = math.log(params[0])
+        return lambda: random.lognormvariate(mu, params[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+# ---------------- Provider responses ----------------
+
+def gemini_response(body):
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": STUB_REPLY}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 120, "candidatesTokenCount": 60, "totalTokenCount": 180},
+        "modelVersion": "gemini-2.5-flash",
+    }
+
+
+def gemini_error(status):
+    return {"error": {"code": status, "message": "Stub Gemini error", "status": "UNAVAILABLE"}}
+
+
+def cohere_response(body):
+    return {
+        "id": str(uuid.uuid4()),
+        "finish_reason": "COMPLETE",
+        "message": {"role": "assistant", "content": [{"type": "text", "text": STUB_SUMMARY}]},
+        "usage": {
+            "billed_units": {"input_tokens": 300, "output_tokens": 60},
+            "tokens": {"input_tokens": 300, "output_tokens": 60},
+        },
+    }
+
+
+def cohere_error(status):
+    return {"message": "Stub Cohere error"}
+
+
+def groq_response(body):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "llama-3.1-8b-instant"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": "Based on the context, the most suitable counselors are listed above."},
+            "logprobs": None,
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 400, "completion_tokens": 40, "total_tokens": 440},
+    }
+
+
+def groq_error(status):
+    return {"error": {"message": "Stub Groq error", "type": "server_error"}}
+
+
+PROVIDERS = {
+    # name: (default port, path fragment that identifies a generation call, ok builder, error builder)
+    "gemini": (8101, ":generateContent", gemini_response, gemini_error),
+    "cohere": (8102, "/v2/chat", cohere_response, cohere_error),
+    "groq": (8103, "/chat/completions", groq_response, groq_error),
+}
+
+
+def make_handler(name, latency, error_rate, error_status, stats):
+    _, path_fragment, ok_builder, error_builder = PROVIDERS[name]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b"{}"
+            try:
+                body = json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                body = {}
+
+            if path_fragment not in self.path:
+                self.send_json(404, {"error": {"message": f"Stub {name} has no route {self.path}"}})
+                return
+
+            time.sleep(latency())
+            if random.random() < error_rate:
+                stats.record(name, error=True)
+                self.send_json(error_status, error_builder(error_status))
+            else:
+                stats.record(name, error=False)
+                self.send_json(200, ok_builder(body))
+
+        def send_json(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # keep the console readable under load
+
+    return Handler
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {name: {"ok": 0, "error": 0} for name in PROVIDERS}
+
+    def record(self, name, error):
+        with self.lock:
+            self.counts[name]["error" if error else "ok"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Gemini / Cohere / Groq servers for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status returned for injected errors (the SDKs retry 429/5xx, so use 400 to see every failure)")
+    for name, (port, *_rest) in PROVIDERS.items():
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+        parser.add_argument(f"--{name}-latency", default="lognormal:500:0.4")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    stats = Stats()
+    servers = []
+    for name in PROVIDERS:
+        port = getattr(args, f"{name}_port")
+        latency = parse_latency(getattr(args, f"{name}_latency"))
+        error_rate = getattr(args, f"{name}_error_rate")
+        handler = make_handler(name, latency, error_rate, args.error_status, stats)
+        server = ThreadingHTTPServer((args.host, port), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        print(f"Stub {name:<7} on http://{args.host}:{port}  latency={getattr(args, f'{name}_latency')}  error_rate={error_rate}")
+
+    try:
+        while True:
+            time.sleep(10)
+            with stats.lock:
+                print("Stub calls:", json.dumps(stats.counts))
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()